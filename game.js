@@ -503,11 +503,11 @@
       this.font = "12px Arial";
       this.big_font = "18px Arial";
       this.keys = new Set();
-      this.timeMs = 0;
       this.reset();
     }
 
     reset() {
+      this.timeMs = 0;
       this.state = STATE_PLAYING;
       this.player = new Player(LOGICAL_W / 2, LOGICAL_H - 40);
       this.playerBullets = [];
@@ -601,6 +601,7 @@
         return;
       }
 
+      this.timeMs += STEP_MS;
       this.player.update(this);
 
       if (this.state === STATE_PLAYING) {
@@ -778,6 +779,12 @@
     ctx.fillText(text, LOGICAL_W / 2 - width / 2, y);
   };
 
+  // Loaded outside the browser (e.g. by parity.js): expose the logic only.
+  if (typeof module !== "undefined" && module.exports) {
+    module.exports = { Game, FPS, STEP_MS };
+    return;
+  }
+
   const canvas = document.getElementById("game");
   const overlay = document.getElementById("overlay");
   const ctx = canvas.getContext("2d");
@@ -881,7 +888,6 @@
     if (accumulator > STEP_MS * 5) accumulator = STEP_MS * 5;
 
     while (accumulator >= STEP_MS) {
-      game.timeMs += STEP_MS;
       game.update();
       accumulator -= STEP_MS;
     }
@@ -1,9 +1,12 @@
+import argparse
 import math
 import os
 import random
 import sys
 import pygame
 
+from runlog import SEED_MAX, SEED_MIN, RunStore
+
 # Logical resolution
 LOGICAL_W = 320
 LOGICAL_H = 288
@@ -73,7 +76,7 @@ class Player(Entity):
         self.reflect = False
 
     def update(self, game):
-        keys = pygame.key.get_pressed()
+        keys = game.keys
         dx = (1 if keys[pygame.K_RIGHT] else 0) - (1 if keys[pygame.K_LEFT] else 0)
         dy = (1 if keys[pygame.K_DOWN] else 0) - (1 if keys[pygame.K_UP] else 0)
         if dx != 0 and dy != 0:
@@ -108,13 +111,14 @@ class Player(Entity):
             else:
                 game.player_bullets.append(PlayerBullet(self.x, self.y - 6, vx, vy))
 
-    def hit(self, game):
+    def hit(self, game, cause):
         if self.invuln > 0 or self.invincible_timer > 0:
             return
         self.lives -= 1
         self.invuln = FPS  # 1 sec
         if self.lives <= 0:
             game.state = STATE_GAMEOVER
+            game.death_cause = cause
 
     def draw(self, surf, debug=False):
         if self.invincible_timer > 0:
@@ -372,7 +376,7 @@ class Boss(Entity):
             if self.y >= 60:
                 self.state = "FIGHT"
         else:
-            self.x += math.sin(pygame.time.get_ticks() / 400) * 0.6
+            self.x += math.sin(game.time_ms / 400) * 0.6
             self.shot_timer -= 1
             if self.shot_timer <= 0:
                 self.shot_timer = 30
@@ -422,16 +426,27 @@ class Boss(Entity):
 
 
 class Game:
-    def __init__(self, screen, scale):
+    def __init__(self, screen, scale, store=None, seed=None, seed_rng=None):
         self.screen = screen
         self.scale = scale
+        self.store = store
+        self.seed_rng = seed_rng
         self.surface = pygame.Surface((LOGICAL_W, LOGICAL_H))
         self.clock = pygame.time.Clock()
         self.font = pygame.font.SysFont("Arial", 12)
         self.big_font = pygame.font.SysFont("Arial", 18)
-        self.reset()
-
-    def reset(self):
+        self.keys = pygame.key.get_pressed()
+        self.reset(seed if seed is not None else self.new_seed())
+
+    def new_seed(self):
+        # Without seed_rng (headless runs) the caller owns the random stream.
+        return self.seed_rng.randrange(1 << 32) if self.seed_rng else None
+
+    def reset(self, seed=None):
+        if seed is not None:
+            random.seed(seed)
+        self.seed = seed
+        self.time_ms = 0
         self.state = STATE_PLAYING
         self.player = Player(LOGICAL_W / 2, LOGICAL_H - 40)
         self.player_bullets = []
@@ -442,6 +457,9 @@ class Game:
         self.score = 0
         self.spawn_timer = 0
         self.phase_time = 0
+        self.frame = 0
+        self.bells_collected = dict.fromkeys(BELL_EFFECTS, 0)
+        self.death_cause = None
         self.debug_collision = False
         self.bell_drop_rate = 0.5
 
@@ -497,19 +515,27 @@ class Game:
                     self.player.invincible_charges -= 1
                     self.player.invincible_timer = FPS * 5
 
+    def handle_event(self, event):
+        self.handle_debug_keys(event)
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
+            if self.state in (STATE_GAMEOVER, STATE_CLEAR):
+                self.reset(self.new_seed())
+
     def update(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
-            self.handle_debug_keys(event)
-            if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
-                if self.state in (STATE_GAMEOVER, STATE_CLEAR):
-                    self.reset()
+            self.handle_event(event)
+        self.keys = pygame.key.get_pressed()
+        self.step()
 
+    def step(self):
         if self.state in (STATE_GAMEOVER, STATE_CLEAR):
             return
 
+        self.frame += 1
+        self.time_ms += 1000 / FPS
         self.player.update(self)
 
         if self.state == STATE_PLAYING:
@@ -538,6 +564,11 @@ class Game:
         if self.boss and not self.boss.alive:
             self.boss = None
 
+        if self.state in (STATE_GAMEOVER, STATE_CLEAR) and self.store:
+            self.store.record(
+                self.score, self.seed, self.frame, self.state, self.death_cause, self.bells_collected
+            )
+
     def handle_collisions(self):
         # Player bullets vs enemies/boss/bells
         for pb in self.player_bullets:
@@ -567,20 +598,21 @@ class Game:
                 if self.player.shield > 0:
                     self.player.shield -= 1
                 else:
-                    self.player.hit(self)
+                    self.player.hit(self, type(eb).__name__)
 
         for e in self.enemies:
             if e.alive and self.circle_hit(e, self.player):
                 e.alive = False
-                self.player.hit(self)
+                self.player.hit(self, type(e).__name__)
 
         if self.boss and self.boss.alive and self.circle_hit(self.boss, self.player):
-            self.player.hit(self)
+            self.player.hit(self, type(self.boss).__name__)
 
         for bell in self.bells:
             if bell.alive and self.circle_hit(bell, self.player):
                 bell.alive = False
                 bell.apply(self.player)
+                self.bells_collected[BELL_EFFECTS[bell.color_index]] += 1
 
     def circle_hit(self, a, b):
         dx = a.x - b.x
@@ -658,7 +690,13 @@ def pick_scale():
     return max(1, min(max_scale_w, max_scale_h, 4))
 
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vertical STG MVP")
+    parser.add_argument("--seed", type=int, help="seed for the first run (default: random)")
+    args = parser.parse_args(argv)
+    if args.seed is not None and not SEED_MIN <= args.seed <= SEED_MAX:
+        parser.error(f"--seed must be between {SEED_MIN} and {SEED_MAX}")
+
     pygame.init()
     pygame.mixer.init()
     pygame.key.stop_text_input()
@@ -671,8 +709,12 @@ def main():
     if os.path.exists(bgm_path):
         pygame.mixer.music.load(bgm_path)
         pygame.mixer.music.play(-1)
-    game = Game(screen, scale)
-    game.run()
+    store = RunStore(os.path.join(os.path.dirname(__file__), "runs.db"), BELL_EFFECTS)
+    try:
+        game = Game(screen, scale, store, seed=args.seed, seed_rng=random.Random())
+        game.run()
+    finally:
+        store.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,103 @@
+"use strict";
+
+// JS side of the parity harness. Reads {seed, frames, events} as JSON on
+// stdin, runs game.js headless and writes {frames, seconds, active} to stdout.
+// Driven by parity.py; see that file for the input log format.
+
+const path = require("path");
+
+const mulberry32 = (seed) => {
+  let a = seed >>> 0;
+  return () => {
+    a = (a + 0x6d2b79f5) >>> 0;
+    let t = Math.imul(a ^ (a >>> 15), 1 | a) >>> 0;
+    t = ((t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t) >>> 0;
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+};
+
+const point = (e) => [e.constructor.name, e.x, e.y];
+
+const snapshot = (game) => {
+  const p = game.player;
+  const boss = game.boss;
+  return {
+    state: game.state,
+    score: game.score,
+    phase_time: game.phase_time,
+    spawn_timer: game.spawn_timer,
+    bell_drop_rate: game.bell_drop_rate,
+    player: {
+      x: p.x,
+      y: p.y,
+      lives: p.lives,
+      invuln: p.invuln,
+      invincible_timer: p.invincible_timer,
+      invincible_charges: p.invincible_charges,
+      shield: p.shield,
+      shot_cd: p.shot_cd,
+      shot_interval: p.shot_interval,
+      spread: p.spread,
+      score_mult: p.score_mult,
+      reflect: p.reflect,
+    },
+    enemies: game.enemies.map((e) => [...point(e), e.hp, e.shot_timer]),
+    player_bullets: game.playerBullets.map(point),
+    enemy_bullets: game.enemyBullets.map(point),
+    bells: game.bells.map((b) => [...point(b), b.color_index]),
+    boss: boss
+      ? {
+          x: boss.x,
+          y: boss.y,
+          hp: boss.hp,
+          state: boss.state,
+          shot_timer: boss.shot_timer,
+          special_timer: boss.special_timer,
+        }
+      : null,
+  };
+};
+
+const run = ({ seed, frames, events }) => {
+  Math.random = mulberry32(seed);
+  const { Game } = require(path.join(__dirname, "game.js"));
+  const game = new Game(null);
+
+  const byFrame = new Map();
+  for (const [frame, kind, code] of events) {
+    if (!byFrame.has(frame)) byFrame.set(frame, []);
+    byFrame.get(frame).push([kind, code]);
+  }
+
+  const out = [];
+  let elapsed = 0n;
+  let active = 0;
+  for (let frame = 0; frame < frames; frame += 1) {
+    for (const [kind, code] of byFrame.get(frame) || []) {
+      if (kind === "down") {
+        game.handleKeydown(code);
+        game.keys.add(code);
+      } else {
+        game.keys.delete(code);
+      }
+    }
+    const simulating = game.state !== "GAMEOVER" && game.state !== "CLEAR";
+    const start = process.hrtime.bigint();
+    game.update();
+    if (simulating) {
+      elapsed += process.hrtime.bigint() - start;
+      active += 1;
+    }
+    out.push(snapshot(game));
+  }
+  return { frames: out, seconds: Number(elapsed) / 1e9, active };
+};
+
+let input = "";
+process.stdin.setEncoding("utf8");
+process.stdin.on("data", (chunk) => {
+  input += chunk;
+});
+process.stdin.on("end", () => {
+  process.stdout.write(JSON.stringify(run(JSON.parse(input))));
+});
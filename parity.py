@@ -0,0 +1,298 @@
+"""Python/JS parity harness for main.py and game.js.
+
+Runs both simulations headless from the same seed and input log, diffs the
+per-frame state and reports the first divergence and the per-frame cost.
+
+    python3 parity.py --seed 1 --frames 3000
+    python3 parity.py --inputs inputs.json
+
+An input log is a JSON list of [frame, "down" | "up", code] entries using
+browser KeyboardEvent codes (ArrowLeft, KeyZ, ...). Without --inputs a log is
+generated from the seed.
+
+main.py's `random` module is replaced by Mulberry32 (random/randint only,
+mirroring Math.random and randInt in game.js); other random calls raise.
+"""
+
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import main
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+KEY_CODES = {
+    "ArrowUp": pygame.K_UP,
+    "ArrowDown": pygame.K_DOWN,
+    "ArrowLeft": pygame.K_LEFT,
+    "ArrowRight": pygame.K_RIGHT,
+    "KeyZ": pygame.K_z,
+    "KeyR": pygame.K_r,
+    "KeyC": pygame.K_c,
+    "KeyB": pygame.K_b,
+    "KeyM": pygame.K_m,
+    "BracketLeft": pygame.K_LEFTBRACKET,
+    "BracketRight": pygame.K_RIGHTBRACKET,
+}
+
+MOVES = [
+    [],
+    ["ArrowLeft"],
+    ["ArrowRight"],
+    ["ArrowUp"],
+    ["ArrowDown"],
+    ["ArrowLeft", "ArrowUp"],
+    ["ArrowRight", "ArrowUp"],
+    ["ArrowLeft", "ArrowDown"],
+    ["ArrowRight", "ArrowDown"],
+]
+
+
+class Mulberry32:
+    # Same generator as parity.js; replaces both `random` and Math.random.
+    def __init__(self, seed):
+        self.a = seed & 0xFFFFFFFF
+
+    def random(self):
+        m = 0xFFFFFFFF
+        self.a = (self.a + 0x6D2B79F5) & m
+        a = self.a
+        t = ((a ^ (a >> 15)) * (1 | a)) & m
+        t = ((t + (((t ^ (t >> 7)) * (61 | t)) & m)) & m) ^ t
+        return ((t ^ (t >> 14)) & m) / 4294967296
+
+    def randint(self, lo, hi):
+        # Matches randInt() in game.js rather than random.randint.
+        return math.floor(self.random() * (hi - lo + 1)) + lo
+
+    def seed(self, seed):
+        self.a = seed & 0xFFFFFFFF
+
+    def __getattr__(self, name):
+        # Only the calls game.js mirrors are ported; say so instead of a bare
+        # AttributeError when main.py starts using another random function.
+        raise AttributeError(
+            f"random.{name} is not supported in parity mode; port it to Mulberry32 and parity.js"
+        )
+
+
+class HeldKeys:
+    # Stands in for pygame.key.get_pressed().
+    def __init__(self):
+        self.held = set()
+
+    def __getitem__(self, key):
+        return key in self.held
+
+
+def tap(events, frame, code):
+    events.append([frame, "down", code])
+    events.append([frame + 1, "up", code])
+
+
+def generate_inputs(seed, frames):
+    # Random movement with Z held. Each cycle taps R (restarts a finished run,
+    # no-op otherwise) and usually B right after, so the boss phase is reached
+    # well before the 60 s timer and dead runs don't stay frozen for long.
+    rng = Mulberry32(seed ^ 0x9E3779B9)
+    events = [[0, "down", "KeyZ"]]
+    held = []
+    frame = 0
+    next_cycle = 0
+    while frame < frames:
+        if frame >= next_cycle:
+            tap(events, frame, "KeyR")
+            if rng.random() < 0.7:
+                tap(events, frame + 5, "KeyB")
+            next_cycle = frame + rng.randint(300, 600)
+        move = MOVES[rng.randint(0, len(MOVES) - 1)]
+        for code in held:
+            if code not in move:
+                events.append([frame, "up", code])
+        for code in move:
+            if code not in held:
+                events.append([frame, "down", code])
+        held = move
+        if rng.random() < 0.1:
+            tap(events, frame, "KeyM")
+        frame += rng.randint(10, 45)
+    return events
+
+
+def point(e):
+    return [type(e).__name__, e.x, e.y]
+
+
+def snapshot(game):
+    p = game.player
+    boss = game.boss
+    return {
+        "state": game.state,
+        "score": game.score,
+        "phase_time": game.phase_time,
+        "spawn_timer": game.spawn_timer,
+        "bell_drop_rate": game.bell_drop_rate,
+        "player": {
+            "x": p.x,
+            "y": p.y,
+            "lives": p.lives,
+            "invuln": p.invuln,
+            "invincible_timer": p.invincible_timer,
+            "invincible_charges": p.invincible_charges,
+            "shield": p.shield,
+            "shot_cd": p.shot_cd,
+            "shot_interval": p.shot_interval,
+            "spread": p.spread,
+            "score_mult": p.score_mult,
+            "reflect": p.reflect,
+        },
+        "enemies": [point(e) + [e.hp, e.shot_timer] for e in game.enemies],
+        "player_bullets": [point(b) for b in game.player_bullets],
+        "enemy_bullets": [point(b) for b in game.enemy_bullets],
+        "bells": [point(b) + [b.color_index] for b in game.bells],
+        "boss": None
+        if boss is None
+        else {
+            "x": boss.x,
+            "y": boss.y,
+            "hp": boss.hp,
+            "state": boss.state,
+            "shot_timer": boss.shot_timer,
+            "special_timer": boss.special_timer,
+        },
+    }
+
+
+def group_events(events):
+    by_frame = {}
+    for frame, kind, code in events:
+        by_frame.setdefault(frame, []).append((kind, code))
+    return by_frame
+
+
+def run_python(seed, frames, events):
+    pygame.init()
+    saved_random = main.random
+    main.random = Mulberry32(seed)
+    try:
+        game = main.Game(None, 1, seed=seed)
+        keys = HeldKeys()
+        game.keys = keys
+        by_frame = group_events(events)
+        out = []
+        elapsed = 0.0
+        active = 0
+        for frame in range(frames):
+            for kind, code in by_frame.get(frame, []):
+                key = KEY_CODES[code]
+                if kind == "down":
+                    game.handle_event(pygame.event.Event(pygame.KEYDOWN, key=key))
+                    keys.held.add(key)
+                else:
+                    keys.held.discard(key)
+            # Finished runs return from step() at once; only time real frames.
+            simulating = game.state not in (main.STATE_GAMEOVER, main.STATE_CLEAR)
+            start = time.perf_counter()
+            game.step()
+            if simulating:
+                elapsed += time.perf_counter() - start
+                active += 1
+            out.append(snapshot(game))
+        return out, elapsed, active
+    finally:
+        main.random = saved_random
+        pygame.quit()
+
+
+def run_js(seed, frames, events, node="node"):
+    payload = json.dumps({"seed": seed, "frames": frames, "events": events})
+    proc = subprocess.run(
+        [node, os.path.join(ROOT, "parity.js")],
+        input=payload,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    result = json.loads(proc.stdout)
+    return result["frames"], result["seconds"], result["active"]
+
+
+def first_difference(a, b, tol, path=""):
+    if isinstance(a, bool) or isinstance(b, bool):
+        return None if a is b else (path, a, b)
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return None if abs(a - b) <= tol else (path, a, b)
+    if isinstance(a, dict) and isinstance(b, dict):
+        for key in sorted(set(a) | set(b)):
+            if key not in a or key not in b:
+                return (f"{path}.{key}", a.get(key), b.get(key))
+            diff = first_difference(a[key], b[key], tol, f"{path}.{key}")
+            if diff:
+                return diff
+        return None
+    if isinstance(a, list) and isinstance(b, list):
+        if len(a) != len(b):
+            return (f"{path}.len", len(a), len(b))
+        for i, (x, y) in enumerate(zip(a, b)):
+            diff = first_difference(x, y, tol, f"{path}[{i}]")
+            if diff:
+                return diff
+        return None
+    return None if a == b else (path, a, b)
+
+
+def first_divergence(py_frames, js_frames, tol):
+    if len(py_frames) != len(js_frames):
+        return (min(len(py_frames), len(js_frames)), "frames", len(py_frames), len(js_frames))
+    for frame, (a, b) in enumerate(zip(py_frames, js_frames)):
+        diff = first_difference(a, b, tol)
+        if diff:
+            path, py_val, js_val = diff
+            return (frame, path.lstrip("."), py_val, js_val)
+    return None
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--frames", type=int, default=main.FPS * 90)
+    parser.add_argument("--inputs", help="JSON input log (default: generated from seed)")
+    parser.add_argument("--tolerance", type=float, default=1e-6)
+    parser.add_argument("--node", default="node")
+    args = parser.parse_args(argv)
+
+    if args.inputs:
+        with open(args.inputs, encoding="utf-8") as f:
+            events = json.load(f)
+    else:
+        events = generate_inputs(args.seed, args.frames)
+
+    py_frames, py_sec, py_active = run_python(args.seed, args.frames, events)
+    js_frames, js_sec, js_active = run_js(args.seed, args.frames, events, args.node)
+
+    py_us = py_sec / max(py_active, 1) * 1e6
+    js_us = js_sec / max(js_active, 1) * 1e6
+    print(f"seed {args.seed}, {args.frames} frames ({py_active} simulated), {len(events)} input events")
+    print(f"python {py_us:.1f} us/frame, js {js_us:.1f} us/frame, py/js {py_us / max(js_us, 1e-9):.2f}x")
+
+    diff = first_divergence(py_frames, js_frames, args.tolerance)
+    if diff:
+        frame, path, py_val, js_val = diff
+        print(f"DIVERGED at frame {frame}: {path} python={py_val!r} js={js_val!r}")
+        return 1
+    print("OK: no divergence")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
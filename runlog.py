@@ -0,0 +1,190 @@
+"""Run history store (SQLite, append-only).
+
+Finished runs are queued by record() and written in batches by a background
+thread, so the game loop never waits on disk. Queries run on indexed columns
+and nothing is loaded at startup.
+
+    python3 runlog.py [runs.db]    # print leaderboard and aggregates
+"""
+
+import logging
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+RUN_COLUMNS = ["ended_at", "seed", "score", "frames", "result", "cause"]
+BELL_PREFIX = "bells_"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    ended_at REAL NOT NULL,
+    seed INTEGER,
+    score INTEGER NOT NULL,
+    frames INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    cause TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_score ON runs (score DESC);
+CREATE INDEX IF NOT EXISTS runs_seed_score ON runs (seed, score DESC);
+CREATE INDEX IF NOT EXISTS runs_cause ON runs (cause);
+"""
+
+SEED_MIN = -(1 << 63)  # SQLite INTEGER is a signed 64-bit value
+SEED_MAX = (1 << 63) - 1
+
+log = logging.getLogger(__name__)
+
+_FLUSH = object()
+_STOP = object()
+
+
+class RunStore:
+    # bell_effects (main.BELL_EFFECTS) gets one counter column per effect;
+    # missing columns are added, so new bell types are never dropped. With
+    # None the columns already in the table are used (e.g. for queries).
+    def __init__(self, path, bell_effects=None, batch_size=4096, flush_interval=1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._conn = sqlite3.connect(path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        existing = [row[1] for row in self._conn.execute("PRAGMA table_info(runs)")]
+        if bell_effects is None:
+            bell_effects = [c[len(BELL_PREFIX):].upper() for c in existing if c.startswith(BELL_PREFIX)]
+        self.bell_effects = list(bell_effects)
+        self.bell_columns = [BELL_PREFIX + effect.lower() for effect in self.bell_effects]
+        for column in self.bell_columns:
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE runs ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+        self._conn.commit()
+        columns = RUN_COLUMNS + self.bell_columns
+        self._insert = f"INSERT INTO runs ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        self._queue = queue.Queue(maxsize=batch_size * 4)
+        self.dropped = 0  # rows not queued because the writer fell behind
+        self.failed = 0  # rows the writer could not insert
+        self._thread = threading.Thread(target=self._writer, name="runlog-writer", daemon=True)
+        self._thread.start()
+
+    def record(self, score, seed, frames, result, cause=None, bells=None, wait=False):
+        # The game loop never blocks: a full queue drops the row. Batch
+        # simulations pass wait=True to block while the writer is alive.
+        if seed is not None and not SEED_MIN <= seed <= SEED_MAX:
+            raise ValueError(f"seed {seed} does not fit in a SQLite INTEGER")
+        bells = bells or {}
+        unknown = set(bells) - set(self.bell_effects)
+        if unknown:
+            raise ValueError(f"unknown bell effects: {sorted(unknown)}")
+        row = (time.time(), seed, score, frames, result, cause) + tuple(bells.get(e, 0) for e in self.bell_effects)
+        while True:
+            try:
+                self._queue.put(row, block=wait, timeout=0.5 if wait else None)
+                return
+            except queue.Full:
+                if not wait or not self._thread.is_alive():
+                    self.dropped += 1
+                    return
+
+    def flush(self):
+        if not self._thread.is_alive():
+            return
+        self._queue.put(_FLUSH)
+        self._queue.join()
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        self._conn.close()
+
+    def _writer(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-16384")
+        try:
+            while True:
+                batch = [self._queue.get()]
+                try:
+                    deadline = time.monotonic() + self.flush_interval
+                    while len(batch) < self.batch_size and batch[-1] is not _FLUSH and batch[-1] is not _STOP:
+                        timeout = deadline - time.monotonic()
+                        if timeout <= 0:
+                            break
+                        try:
+                            batch.append(self._queue.get(timeout=timeout))
+                        except queue.Empty:
+                            break
+                    rows = [r for r in batch if r is not _FLUSH and r is not _STOP]
+                    if rows:
+                        try:
+                            with conn:
+                                conn.executemany(self._insert, rows)
+                        except Exception:
+                            self.failed += len(rows)
+                            log.exception("runlog: failed to write %d runs to %s", len(rows), self.path)
+                finally:
+                    # Every item taken must be acknowledged or flush() waits forever.
+                    for _ in batch:
+                        self._queue.task_done()
+                if batch[-1] is _STOP:
+                    break
+        finally:
+            conn.close()
+
+    def leaderboard(self, limit=10, seed=None):
+        sql = "SELECT id, ended_at, seed, score, frames, result, cause FROM runs"
+        args = []
+        if seed is not None:
+            sql += " WHERE seed = ?"
+            args.append(seed)
+        sql += " ORDER BY score DESC LIMIT ?"
+        args.append(limit)
+        return [dict(row) for row in self._conn.execute(sql, args)]
+
+    def aggregates(self, seed=None):
+        where = ""
+        args = []
+        if seed is not None:
+            where = " WHERE seed = ?"
+            args.append(seed)
+        bell_sums = "".join(f", COALESCE(SUM({c}), 0) AS {c}" for c in self.bell_columns)
+        row = self._conn.execute(
+            "SELECT COUNT(*) AS runs, AVG(score) AS avg_score, MAX(score) AS max_score,"
+            " AVG(frames) AS avg_frames, COALESCE(SUM(result = 'CLEAR'), 0) AS clears"
+            f"{bell_sums} FROM runs{where}",
+            args,
+        ).fetchone()
+        stats = dict(row)
+        stats["bells"] = {e: stats.pop(c) for e, c in zip(self.bell_effects, self.bell_columns)}
+        stats["deaths"] = dict(
+            self._conn.execute(
+                f"SELECT cause, COUNT(*) FROM runs{where}{' AND' if where else ' WHERE'} cause IS NOT NULL"
+                " GROUP BY cause ORDER BY COUNT(*) DESC",
+                args,
+            ).fetchall()
+        )
+        return stats
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    path = argv[0] if argv else os.path.join(os.path.dirname(os.path.abspath(__file__)), "runs.db")
+    store = RunStore(path)
+    try:
+        for i, run in enumerate(store.leaderboard(), 1):
+            print(f"{i:2d}. {run['score']:8d}  {run['result']:8s}  seed {run['seed']}  {run['frames']} frames")
+        stats = store.aggregates()
+        print(f"runs {stats['runs']}, clears {stats['clears']}, max {stats['max_score']}, avg {stats['avg_score']}")
+        print("bells", stats["bells"])
+        print("deaths", stats["deaths"])
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import pytest
+
+from runlog import RunStore
+
+EFFECTS = ["SPREAD", "RAPID", "SCORE"]
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = RunStore(str(tmp_path / "runs.db"), EFFECTS, flush_interval=0.01)
+    yield s
+    s.close()
+
+
+def test_record_and_flush_writes_rows(store):
+    for score in (100, 300, 200):
+        store.record(score, 7, 900, "GAMEOVER", "EnemyBullet")
+    store.flush()
+
+    assert store.aggregates()["runs"] == 3
+    assert store.dropped == 0
+    assert store.failed == 0
+
+
+def test_leaderboard_orders_by_score_and_filters_by_seed(store):
+    store.record(100, 1, 900, "GAMEOVER", "Boss")
+    store.record(500, 2, 900, "CLEAR")
+    store.record(300, 1, 900, "GAMEOVER", "ChargeEnemy")
+    store.flush()
+
+    assert [r["score"] for r in store.leaderboard()] == [500, 300, 100]
+    assert [r["score"] for r in store.leaderboard(limit=2)] == [500, 300]
+    assert [r["score"] for r in store.leaderboard(seed=1)] == [300, 100]
+
+
+def test_aggregates_count_clears_bells_and_deaths(store):
+    store.record(100, 1, 600, "GAMEOVER", "Boss", {"SPREAD": 2})
+    store.record(200, 1, 900, "GAMEOVER", "Boss", {"SPREAD": 1, "RAPID": 3})
+    store.record(300, 2, 1200, "GAMEOVER", "EnemyBullet")
+    store.record(900, 2, 3000, "CLEAR", None, {"SCORE": 1})
+    store.flush()
+
+    stats = store.aggregates()
+    assert stats["runs"] == 4
+    assert stats["clears"] == 1
+    assert stats["max_score"] == 900
+    assert stats["bells"] == {"SPREAD": 3, "RAPID": 3, "SCORE": 1}
+    assert stats["deaths"] == {"Boss": 2, "EnemyBullet": 1}
+
+    seeded = store.aggregates(seed=1)
+    assert seeded["runs"] == 2
+    assert seeded["deaths"] == {"Boss": 2}
+
+
+def test_reopen_with_new_effect_adds_column(tmp_path):
+    path = str(tmp_path / "runs.db")
+    s = RunStore(path, EFFECTS, flush_interval=0.01)
+    s.record(100, 1, 900, "CLEAR", None, {"SPREAD": 1})
+    s.close()
+
+    s = RunStore(path, EFFECTS + ["LASER"], flush_interval=0.01)
+    s.record(200, 1, 900, "CLEAR", None, {"LASER": 2})
+    s.flush()
+    s.close()
+
+    s = RunStore(path)
+    try:
+        assert s.bell_effects == EFFECTS + ["LASER"]
+        assert s.aggregates()["bells"] == {"SPREAD": 1, "RAPID": 0, "SCORE": 0, "LASER": 2}
+    finally:
+        s.close()
+
+
+def test_unknown_effect_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.record(100, 1, 900, "CLEAR", None, {"BOMB": 1})
+
+
+def test_out_of_range_seed_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.record(100, 1 << 64, 900, "CLEAR")
+
+
+def test_writer_survives_a_bad_row(store):
+    # A score too large for SQLite makes the insert raise OverflowError.
+    store.record(1 << 64, 1, 900, "CLEAR")
+    store.flush()
+    assert store.failed == 1
+
+    store.record(100, 1, 900, "CLEAR")
+    store.flush()
+    assert store.aggregates()["runs"] == 1
+    assert store.failed == 1